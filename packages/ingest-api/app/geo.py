@@ -0,0 +1,65 @@
+import asyncio
+import os
+import time
+from typing import Dict, Optional
+import structlog
+
+logger = structlog.get_logger()
+
+GEOIP_DB_PATH = os.getenv("GEOIP_DB_PATH", "/data/GeoLite2-City.mmdb")
+# IPs within a /24 share geo data, so cache per truncated prefix
+GEO_CACHE_TTL = float(os.getenv("GEO_CACHE_TTL", "86400"))
+GEO_CACHE_MAXSIZE = int(os.getenv("GEO_CACHE_MAXSIZE", "100000"))
+
+_reader = None
+# ip_trunc -> (expires_at, geo dict or None)
+_geo_cache: Dict[str, tuple] = {}
+# ip_trunc -> Future, so concurrent lookups for one prefix coalesce
+_inflight: Dict[str, asyncio.Future] = {}
+
+def _get_reader():
+    global _reader
+    if _reader is None:
+        import geoip2.database
+        _reader = geoip2.database.Reader(GEOIP_DB_PATH)
+    return _reader
+
+def _lookup(ip_trunc: str) -> Optional[Dict[str, str]]:
+    try:
+        response = _get_reader().city(ip_trunc)
+        return {
+            "geo_country": response.country.iso_code,
+            "geo_region": response.subdivisions.most_specific.name,
+            "geo_city": response.city.name
+        }
+    except Exception as e:
+        logger.warning("Geo lookup failed", ip_trunc=ip_trunc, error=str(e))
+        return None
+
+async def get_geo_data(ip_trunc: str) -> Optional[Dict[str, str]]:
+    """Resolve geo data for a truncated IP (cached per prefix, single-flight)"""
+    cached = _geo_cache.get(ip_trunc)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+
+    # Coalesce concurrent lookups for the same prefix into one request
+    inflight = _inflight.get(ip_trunc)
+    if inflight is not None:
+        return await inflight
+
+    future = asyncio.get_event_loop().create_future()
+    _inflight[ip_trunc] = future
+    try:
+        geo_data = await asyncio.to_thread(_lookup, ip_trunc)
+
+        # Bound the cache; evict the oldest entry once full
+        if len(_geo_cache) >= GEO_CACHE_MAXSIZE:
+            _geo_cache.pop(next(iter(_geo_cache)))
+        _geo_cache[ip_trunc] = (time.monotonic() + GEO_CACHE_TTL, geo_data)
+
+        future.set_result(geo_data)
+        return geo_data
+    finally:
+        if not future.done():
+            future.set_result(None)
+        _inflight.pop(ip_trunc, None)
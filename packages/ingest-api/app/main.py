@@ -1,4 +1,5 @@
-from fastapi import FastAPI, HTTPException, Depends, Request, Header
+from fastapi import FastAPI, HTTPException, Depends, Request, Header, BackgroundTasks
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from contextlib import asynccontextmanager
@@ -11,9 +12,14 @@ from typing import Optional, Dict, Any
 import hmac
 import hashlib
 import ipaddress
-import json
+import uuid
+import uvloop
+import msgspec
 from dotenv import load_dotenv
 
+# libuv-based event loop; also applies when uvicorn is launched externally
+uvloop.install()
+
 # Add parent directory to path for shared schemas
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../shared/src'))
 from python_schemas import *
@@ -53,13 +59,16 @@ async def lifespan(app: FastAPI):
     logger.info("CBC-Agent Analytics Ingest API started", 
                 env=os.getenv("ENVIRONMENT", "development"))
     yield
-    # Shutdown
+    # Shutdown - drain buffered events before exiting
+    db = await get_db()
+    await db.disconnect()
     logger.info("CBC-Agent Analytics Ingest API shutting down")
 
 app = FastAPI(
     title="CBC-Agent Analytics Ingest API",
     description="Internal analytics data ingestion for CBC-Agent",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
     docs_url="/docs" if os.getenv("ENVIRONMENT") == "development" else None,
     redoc_url=None,
     lifespan=lifespan
@@ -90,61 +99,153 @@ IP_SALT = os.getenv("IP_SALT", "rotate-quarterly")
 async def health_check():
     return {"status": "healthy", "app": "cbc-agent-analytics-ingest"}
 
+async def _process_event(event_id: str, envelope: EventEnvelope,
+                         client_ip: Optional[str], db):
+    """Per-event work done off the request path (IP, geo, metrics, store)"""
+    try:
+        # Process IP data
+        ip_data = None
+        if client_ip and not STORE_RAW_IP:
+            ip_data = process_ip_data(client_ip, IP_SALT)
+            # Lookup keyed on the truncated prefix so the geo cache hits
+            # for every IP in the same /24
+            geo_data = await get_geo_data(ip_data["ip_trunc"])
+            if geo_data:
+                ip_data.update(geo_data)
+
+        event_data = {
+            "id": event_id,
+            "envelope": msgspec.to_builtins(envelope),
+            # to_builtins renders ts as an ISO string for the JSONB payload;
+            # the typed events.ts column needs the actual datetime
+            "ts": envelope.ts,
+            "ip_data": ip_data
+        }
+
+        # Track metrics
+        await track_event(envelope.event_type, envelope.guest_pseudonymous_id)
+
+        await db.store_event(event_data)
+
+        logger.info("Event ingested",
+                   event_type=envelope.event_type,
+                   guest_id=envelope.guest_pseudonymous_id)
+
+    except Exception as e:
+        logger.error("Failed to process event", event_id=event_id, error=str(e))
+
 @app.post("/ingest/event")
 async def ingest_event(
-    envelope: EventEnvelope,
     request: Request,
+    background_tasks: BackgroundTasks,
     db=Depends(get_db)
 ):
     """Main event ingestion endpoint"""
     try:
+        # Decode straight from the raw body bytes; msgspec parses and
+        # validates into the typed struct in a single pass
+        try:
+            envelope = EVENT_ENVELOPE_DECODER.decode(await request.body())
+        except msgspec.DecodeError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+
         # Validate source app
         if envelope.app_id != SOURCE_APP:
             raise HTTPException(status_code=400, detail="Invalid app_id")
-        
+
         # Check Do-Not-Track
         if request.headers.get("DNT") == "1":
             logger.info("Respecting DNT header, event not stored")
             return {"status": "ok", "dnt": True}
-        
-        # Process IP data
-        client_ip = envelope.ip_raw or request.client.host
-        ip_data = None
-        if client_ip and not STORE_RAW_IP:
-            ip_data = process_ip_data(client_ip, IP_SALT)
-            geo_data = await get_geo_data(client_ip)
-            if geo_data:
-                ip_data.update(geo_data)
-        
+
         # Validate consent for PII operations
         if not validate_consent(envelope.consent_flags):
-            logger.info("Consent not given for analytics", 
+            logger.info("Consent not given for analytics",
                        guest_id=envelope.guest_pseudonymous_id)
             return {"status": "ok", "consent": False}
-        
-        # Store event
-        event_data = {
-            "envelope": envelope.dict(),
-            "ip_data": ip_data,
-            "received_at": datetime.utcnow().isoformat()
-        }
-        
-        # Track metrics
-        await track_event(envelope.event_type, envelope.guest_pseudonymous_id)
-        
-        # Store in database (implementation depends on your DB choice)
-        await db.store_event(event_data)
-        
-        logger.info("Event ingested", 
-                   event_type=envelope.event_type,
-                   guest_id=envelope.guest_pseudonymous_id)
-        
-        return {"status": "ok", "event_id": event_data.get("id")}
-        
+
+        # Accept immediately with a pre-generated id; IP/geo/metrics/store
+        # run after the response so latency is bounded by validation only
+        event_id = str(uuid.uuid4())
+        client_ip = envelope.ip_raw or request.client.host
+        background_tasks.add_task(_process_event, event_id, envelope, client_ip, db)
+
+        return ORJSONResponse(
+            status_code=202,
+            content={"status": "accepted", "event_id": event_id}
+        )
+
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error("Failed to ingest event", error=str(e))
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@app.post("/ingest/events")
+async def ingest_events(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db=Depends(get_db)
+):
+    """Bulk event ingestion endpoint (one JSON array per request)"""
+    try:
+        try:
+            envelopes = EVENT_BATCH_DECODER.decode(await request.body())
+        except msgspec.DecodeError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+
+        # Check Do-Not-Track once for the whole batch
+        if request.headers.get("DNT") == "1":
+            logger.info("Respecting DNT header, batch not stored")
+            return {"status": "ok", "dnt": True}
+
+        client_ip = request.client.host
+        event_ids = []
+        skipped = 0
+        for envelope in envelopes:
+            if envelope.app_id != SOURCE_APP:
+                raise HTTPException(status_code=400, detail="Invalid app_id")
+
+            # Consent is per event; drop non-consenting ones, keep the rest
+            if not validate_consent(envelope.consent_flags):
+                skipped += 1
+                continue
+
+            event_id = str(uuid.uuid4())
+            event_ids.append(event_id)
+            background_tasks.add_task(
+                _process_event, event_id, envelope,
+                envelope.ip_raw or client_ip, db
+            )
+
+        return ORJSONResponse(
+            status_code=202,
+            content={"status": "accepted", "event_ids": event_ids, "skipped": skipped}
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Failed to ingest event batch", error=str(e))
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+def _construct_trusted(struct_type, data: Dict[str, Any]):
+    """Build a struct from trusted, already-verified data without validation
+
+    Struct __init__ skips msgspec's decode-time checks entirely; unknown
+    keys are dropped to match what the validating path ignores. HMAC proves
+    provenance, not types, so datetime-annotated fields still have their
+    ISO strings parsed into real datetimes for the typed columns downstream.
+    """
+    kwargs = {}
+    for key, value in data.items():
+        if key not in struct_type.__struct_fields__:
+            continue
+        if isinstance(value, str) and struct_type.__annotations__.get(key) is datetime:
+            value = datetime.fromisoformat(value)
+        kwargs[key] = value
+    return struct_type(**kwargs)
+
 @app.post("/webhook/cbc-agent/{webhook_type}")
 async def receive_webhook(
     webhook_type: str,
@@ -157,7 +258,7 @@ async def receive_webhook(
     try:
         # Verify HMAC signature
         if not verify_webhook_signature(
-            payload.dict(), 
+            payload.model_dump(), 
             x_signature or payload.signature, 
             HMAC_SECRET
         ):
@@ -165,10 +266,12 @@ async def receive_webhook(
             raise HTTPException(status_code=401, detail="Invalid signature")
         
         # Process webhook based on type
+        # trusted source — the payload passed HMAC verification, so build
+        # the struct directly and skip field validation/coercion
         if webhook_type == "service_request":
-            event = ServiceRequestCreatedEvent(**payload.payload)
+            event = _construct_trusted(ServiceRequestCreatedEvent, payload.payload)
         elif webhook_type == "chat_session":
-            event = ChatStartEvent(**payload.payload)
+            event = _construct_trusted(ChatStartEvent, payload.payload)
         elif webhook_type == "booking":
             # Handle booking webhooks
             pass
@@ -177,7 +280,7 @@ async def receive_webhook(
             raise HTTPException(status_code=400, detail="Unknown webhook type")
         
         # Store webhook data
-        await db.store_webhook(webhook_type, event.dict())
+        await db.store_webhook(webhook_type, msgspec.to_builtins(event))
         
         logger.info("Webhook processed", webhook_type=webhook_type)
         return {"status": "ok"}
@@ -203,7 +306,7 @@ async def update_guest_profile(
             raise HTTPException(status_code=403, detail="Consent not given")
         
         # Store profile
-        await db.upsert_guest_profile(profile.dict())
+        await db.upsert_guest_profile(profile.model_dump())
         
         logger.info("Guest profile updated", guest_id=profile.guest_id)
         return {"status": "ok"}
@@ -259,18 +362,19 @@ async def export_guest_data(
     token: str,
     db=Depends(get_db)
 ):
-    """Export all data for a guest (GDPR)"""
+    """Export all data for a guest as NDJSON (GDPR)"""
     try:
         # Verify token
         if not await db.verify_privacy_token(guest_id, token):
             raise HTTPException(status_code=401, detail="Invalid token")
-        
-        # Gather all data
-        data = await db.export_guest_data(guest_id)
-        
-        logger.info("Guest data exported", guest_id=guest_id)
-        return data
-        
+
+        # Stream rows instead of materializing the full export in memory
+        logger.info("Guest data export started", guest_id=guest_id)
+        return StreamingResponse(
+            db.stream_guest_data(guest_id),
+            media_type="application/x-ndjson"
+        )
+
     except Exception as e:
         logger.error("Failed to export guest data", error=str(e))
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -303,5 +407,8 @@ if __name__ == "__main__":
         "main:app",
         host="0.0.0.0",
         port=int(os.getenv("PORT", 8001)),
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WORKERS", 4)),
         reload=os.getenv("ENVIRONMENT") == "development"
     )
\ No newline at end of file
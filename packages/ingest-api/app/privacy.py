@@ -1,12 +1,19 @@
 import re
 import hashlib
 import hmac
-import ipaddress
+import socket
+from functools import lru_cache
 from typing import Dict, Any, Optional
 import structlog
+from blake3 import blake3
 
 logger = structlog.get_logger()
 
+@lru_cache(maxsize=8)
+def _keyed_hash_key(salt: str) -> bytes:
+    """Derive the 32-byte BLAKE3 key for a salt (cached across calls)"""
+    return hashlib.blake2s(salt.encode(), digest_size=32).digest()
+
 # PII patterns
 EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
 PHONE_PATTERN = re.compile(r'\b(?:\+?1[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}\b')
@@ -14,53 +21,51 @@ SSN_PATTERN = re.compile(r'\b\d{3}-\d{2}-\d{4}\b')
 CC_PATTERN = re.compile(r'\b(?:\d{4}[-\s]?){3}\d{4}\b')
 BOOKING_REF_PATTERN = re.compile(r'\b[A-Z0-9]{6,10}\b')
 
+# All PII patterns combined into one alternation so redaction is a single
+# scan instead of four sequential passes. Order matters: email first, then
+# the more specific numeric patterns (SSN/CC) before the looser phone match.
+PII_PATTERN = re.compile(
+    r'(?P<EMAIL>\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b)'
+    r'|(?P<SSN>\b\d{3}-\d{2}-\d{4}\b)'
+    r'|(?P<CC>\b(?:\d{4}[-\s]?){3}\d{4}\b)'
+    r'|(?P<PHONE>\b(?:\+?1[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}\b)'
+)
+
+def _replace_pii(match: re.Match) -> str:
+    return f'[{match.lastgroup}_REDACTED]'
+
 def redact_pii(text: str) -> str:
     """Redact PII from text"""
     if not text:
         return text
-    
-    # Redact emails
-    text = EMAIL_PATTERN.sub('[EMAIL_REDACTED]', text)
-    
-    # Redact phone numbers
-    text = PHONE_PATTERN.sub('[PHONE_REDACTED]', text)
-    
-    # Redact SSN-like patterns
-    text = SSN_PATTERN.sub('[SSN_REDACTED]', text)
-    
-    # Redact credit card numbers
-    text = CC_PATTERN.sub('[CC_REDACTED]', text)
-    
-    # Optionally redact booking references
-    # text = BOOKING_REF_PATTERN.sub('[BOOKING_REF]', text)
-    
-    return text
+
+    return PII_PATTERN.sub(_replace_pii, text)
+
+# Constant netmasks for /24 (IPv4) and /48 (IPv6) truncation
+V4_MASK = 0xFFFFFF00
+V6_MASK = ((1 << 128) - 1) ^ ((1 << 80) - 1)
 
 def truncate_ip(ip_str: str) -> str:
     """Truncate IP address for privacy (/24 for IPv4, /48 for IPv6)"""
     try:
-        ip = ipaddress.ip_address(ip_str)
-        
-        if isinstance(ip, ipaddress.IPv4Address):
-            # Keep first 3 octets for IPv4
-            network = ipaddress.ip_network(f"{ip}/24", strict=False)
-            return str(network.network_address)
-        else:
-            # Keep first 48 bits for IPv6
-            network = ipaddress.ip_network(f"{ip}/48", strict=False)
-            return str(network.network_address)
+        # Bit-mask the packed address directly instead of building
+        # ipaddress objects; this path runs on every ingested event
+        try:
+            packed = socket.inet_pton(socket.AF_INET, ip_str)
+            masked = int.from_bytes(packed, 'big') & V4_MASK
+            return socket.inet_ntop(socket.AF_INET, masked.to_bytes(4, 'big'))
+        except OSError:
+            packed = socket.inet_pton(socket.AF_INET6, ip_str)
+            masked = int.from_bytes(packed, 'big') & V6_MASK
+            return socket.inet_ntop(socket.AF_INET6, masked.to_bytes(16, 'big'))
     except Exception as e:
         logger.error("Failed to truncate IP", ip=ip_str, error=str(e))
         return "0.0.0.0"
 
 def hash_ip(ip_str: str, salt: str) -> str:
-    """Hash IP address with HMAC-SHA256"""
+    """Hash IP address with keyed BLAKE3"""
     try:
-        return hmac.new(
-            salt.encode(),
-            ip_str.encode(),
-            hashlib.sha256
-        ).hexdigest()
+        return blake3(ip_str.encode(), key=_keyed_hash_key(salt)).hexdigest()
     except Exception as e:
         logger.error("Failed to hash IP", error=str(e))
         return ""
@@ -72,37 +77,61 @@ def process_ip_data(ip_str: str, salt: str) -> Dict[str, str]:
         "ip_hash": hash_ip(ip_str, salt)
     }
 
-def validate_consent(consent_flags: Dict[str, Any]) -> bool:
-    """Validate if analytics consent is given"""
-    return consent_flags.get("analytics", False)
+def validate_consent(consent_flags: Any) -> bool:
+    """Validate if analytics consent is given
+
+    Takes the decoded ConsentFlags struct from the ingest path, or a plain
+    dict from callers that still work with raw payloads.
+    """
+    if isinstance(consent_flags, dict):
+        return consent_flags.get("analytics", False)
+    return bool(consent_flags.analytics)
 
 def anonymize_guest_id(guest_id: str, salt: str) -> str:
     """Create anonymized guest ID"""
-    return hashlib.sha256(f"{guest_id}{salt}".encode()).hexdigest()
+    # Keyed BLAKE3 with the cached salt-derived key; no per-call string
+    # concat and same SIMD-backed hash as hash_ip
+    return blake3(guest_id.encode(), key=_keyed_hash_key(salt)).hexdigest()
+
+# Strings without "@" or a digit cannot match any PII pattern, so the
+# regex scan can be skipped entirely for them
+_HAS_PII_CHARS = re.compile(r'[@\d]').search
+
+def _redacted_value(value: Any, fields_to_redact: list, stack: list) -> Any:
+    """Redact a single value, deferring containers onto the work stack"""
+    if isinstance(value, str):
+        return redact_pii(value) if _HAS_PII_CHARS(value) else value
+    if isinstance(value, dict):
+        child = {}
+        stack.append((child, value))
+        return child
+    if isinstance(value, list):
+        child = []
+        stack.append((child, value))
+        return child
+    return value
 
 def redact_json(data: Dict[str, Any], fields_to_redact: list = None) -> Dict[str, Any]:
     """Redact PII from JSON data"""
     if fields_to_redact is None:
         fields_to_redact = ['email', 'phone', 'name', 'address', 'ssn', 'credit_card']
-    
+
+    # Iterative traversal on an explicit work stack instead of recursion,
+    # so deeply nested payloads don't pay per-frame call overhead
     result = {}
-    for key, value in data.items():
-        if key in fields_to_redact:
-            result[key] = '[REDACTED]'
-        elif isinstance(value, str):
-            result[key] = redact_pii(value)
-        elif isinstance(value, dict):
-            result[key] = redact_json(value, fields_to_redact)
-        elif isinstance(value, list):
-            result[key] = [
-                redact_json(item, fields_to_redact) if isinstance(item, dict) 
-                else redact_pii(item) if isinstance(item, str)
-                else item
-                for item in value
-            ]
+    stack = [(result, data)]
+    while stack:
+        dst, src = stack.pop()
+        if isinstance(src, dict):
+            for key, value in src.items():
+                if key in fields_to_redact:
+                    dst[key] = '[REDACTED]'
+                else:
+                    dst[key] = _redacted_value(value, fields_to_redact, stack)
         else:
-            result[key] = value
-    
+            for value in src:
+                dst.append(_redacted_value(value, fields_to_redact, stack))
+
     return result
 
 def get_retention_period(event_type: str) -> int:
@@ -1,63 +1,51 @@
 from datetime import datetime
-from typing import Optional, List, Literal, Any
-from enum import Enum
-from pydantic import BaseModel, Field, EmailStr
-
-class DeviceType(str, Enum):
-    DESKTOP = "desktop"
-    MOBILE = "mobile"
-    TABLET = "tablet"
-
-class Channel(str, Enum):
-    WEB = "web"
-    APP = "app"
-    WHATSAPP = "whatsapp"
-    SMS = "sms"
-    PHONE = "phone"
-    EMAIL = "email"
-
-class ServiceCategory(str, Enum):
-    HOUSEKEEPING = "housekeeping"
-    MAINTENANCE = "maintenance"
-    DINING = "dining"
-    SPA = "spa"
-    TENNIS = "tennis"
-    TRANSPORT = "transport"
-    IT = "it"
-    OTHER = "other"
-
-class RequestStatus(str, Enum):
-    OPEN = "open"
-    IN_PROGRESS = "in_progress"
-    RESOLVED = "resolved"
-    CLOSED = "closed"
-    CANCELLED = "cancelled"
-
-class Priority(str, Enum):
-    LOW = "low"
-    MEDIUM = "medium"
-    HIGH = "high"
-    URGENT = "urgent"
-
-class SelectionType(str, Enum):
-    DINING = "dining"
-    SPA = "spa"
-    TENNIS = "tennis"
-    TRANSPORT = "transport"
-    ACTIVITY = "activity"
-    FAQ = "faq"
-
-class ConsentFlags(BaseModel):
+from typing import Optional, List, Literal, Any, Annotated
+import msgspec
+from msgspec import Meta
+from pydantic import BaseModel, StringConstraints
+
+# Syntactic email check; pydantic's EmailStr routes through the
+# email-validator package, which is far heavier than this field warrants
+EmailStrLike = Annotated[str, StringConstraints(pattern=r"^[^@\s]+@[^@\s]+\.[^@\s]+$")]
+
+# Closed string vocabularies as Literal aliases rather than str-Enums:
+# validation is a bare set-membership check and decoded values stay plain
+# strings, with no enum instance per field
+DeviceType = Literal["desktop", "mobile", "tablet"]
+
+Channel = Literal["web", "app", "whatsapp", "sms", "phone", "email"]
+
+ServiceCategory = Literal[
+    "housekeeping", "maintenance", "dining", "spa",
+    "tennis", "transport", "it", "other"
+]
+
+RequestStatus = Literal["open", "in_progress", "resolved", "closed", "cancelled"]
+
+Priority = Literal["low", "medium", "high", "urgent"]
+
+SelectionType = Literal["dining", "spa", "tennis", "transport", "activity", "faq"]
+
+# Ingest-side schemas are msgspec Structs: JSON decodes straight into typed
+# objects in one C pass, which is where validation cost actually lands.
+# gc=False is safe because event data never forms reference cycles; unknown
+# fields are ignored, matching the old extra='ignore' behavior. kw_only is
+# per-class in msgspec, so each subclass sets it to keep declaration order
+# free of the defaults-last rule.
+class Schema(msgspec.Struct, frozen=True, gc=False):
+    pass
+
+class ConsentFlags(Schema, kw_only=True):
     analytics: bool
     marketing: Optional[bool] = None
     functional: bool = True
 
-class DeviceInfo(BaseModel):
+class DeviceInfo(Schema, kw_only=True):
     type: DeviceType
     os: str
     browser: Optional[str] = None
 
-class EventEnvelope(BaseModel):
+class EventEnvelope(Schema, kw_only=True):
     app_id: Literal["CBC-Agent"] = "CBC-Agent"
     schema_version: str = "1.0.0"
     event_type: str
@@ -69,15 +57,15 @@ class EventEnvelope(BaseModel):
     consent_flags: ConsentFlags
     ip_raw: Optional[str] = None  # Will be processed and discarded
 
-class IPData(BaseModel):
+class IPData(Schema, kw_only=True):
     ip_trunc: str  # /24 for IPv4, /48 for IPv6
-    ip_hash: str   # HMAC-SHA256 with rotating salt
+    ip_hash: str   # keyed BLAKE3 with rotating salt
     geo_country: Optional[str] = None
     geo_region: Optional[str] = None
     geo_city: Optional[str] = None
 
 # Entities
-class GuestEntity(BaseModel):
+class GuestEntity(Schema, kw_only=True):
     pseudonymous_id: str
     consent_given: bool
     consent_purposes: List[str]
@@ -88,17 +76,18 @@ class GuestEntity(BaseModel):
     membership_tier: Optional[Literal["member", "guest", "vip"]] = None
     marketing_opt_in: bool = False
 
+# Stays a pydantic model: it is a FastAPI request body
 class GuestProfileOptional(BaseModel):
     guest_id: str
     name: Optional[str] = None
-    email: Optional[EmailStr] = None
+    email: Optional[EmailStrLike] = None
     phone: Optional[str] = None
     country: Optional[str] = None
     member_id: Optional[str] = None
     preferred_contact_method: Optional[Literal["email", "phone", "sms", "whatsapp"]] = None
     updated_at: datetime
 
-class SessionEntity(BaseModel):
+class SessionEntity(Schema, kw_only=True):
     session_id: str
     guest_id: str
     channel: Channel
@@ -116,7 +105,7 @@ class SessionEntity(BaseModel):
     ip_trunc: str
     ip_hash: str
 
-class FAQArticle(BaseModel):
+class FAQArticle(Schema, kw_only=True):
     id: str
     slug: str
     title: str
@@ -124,7 +113,7 @@ class FAQArticle(BaseModel):
     published_at: datetime
     last_updated_at: datetime
 
-class ServiceRequest(BaseModel):
+class ServiceRequest(Schema, kw_only=True):
     id: str
     guest_id: str
     channel: Channel
@@ -135,9 +124,9 @@ class ServiceRequest(BaseModel):
     created_at: datetime
     closed_at: Optional[datetime] = None
     sla_breached: bool = False
-    tags: List[str] = Field(default_factory=list)
+    tags: List[str] = msgspec.field(default_factory=list)
 
-class ChatSession(BaseModel):
+class ChatSession(Schema, kw_only=True):
     id: str
     guest_id: str
     started_at: datetime
@@ -145,20 +134,20 @@ class ChatSession(BaseModel):
     locale: Optional[str] = None
     resolved: bool = False
     handoff_to_agent: bool = False
-    csat: Optional[int] = Field(None, ge=1, le=5)
+    csat: Optional[Annotated[int, Meta(ge=1, le=5)]] = None
 
-class ChatMessage(BaseModel):
+class ChatMessage(Schema, kw_only=True):
     id: str
     session_id: str
     sender: Literal["guest", "agent", "bot"]
     ts: datetime
     text_redacted: str  # PII removed
     intent: Optional[str] = None
-    entities: List[str] = Field(default_factory=list)
+    entities: List[str] = msgspec.field(default_factory=list)
     tokens: Optional[int] = None
 
 # Events
-class PageViewEvent(BaseModel):
+class PageViewEvent(Schema, kw_only=True):
     event_type: Literal["page_view"] = "page_view"
     ts: datetime
     session_id: str
@@ -167,7 +156,7 @@ class PageViewEvent(BaseModel):
     ms_on_page: int
     referrer: Optional[str] = None
 
-class SearchEvent(BaseModel):
+class SearchEvent(Schema, kw_only=True):
     event_type: Literal["search"] = "search"
     ts: datetime
     guest_id: str
@@ -176,7 +165,7 @@ class SearchEvent(BaseModel):
     clicked_faq_id: Optional[str] = None
     zero_result: bool
 
-class FAQViewEvent(BaseModel):
+class FAQViewEvent(Schema, kw_only=True):
     event_type: Literal["faq_view"] = "faq_view"
     ts: datetime
     guest_id: str
@@ -185,7 +174,7 @@ class FAQViewEvent(BaseModel):
     from_search: bool
     helpful_vote: Optional[bool] = None
 
-class ChatStartEvent(BaseModel):
+class ChatStartEvent(Schema, kw_only=True):
     event_type: Literal["chat_start"] = "chat_start"
     ts: datetime
     chat_session_id: str
@@ -193,15 +182,15 @@ class ChatStartEvent(BaseModel):
     entrypoint: str
     intent_initial: Optional[str] = None
 
-class ChatEndEvent(BaseModel):
+class ChatEndEvent(Schema, kw_only=True):
     event_type: Literal["chat_end"] = "chat_end"
     ts: datetime
     chat_session_id: str
     resolved: bool
     handoff_to_agent: bool
-    csat: Optional[int] = Field(None, ge=1, le=5)
+    csat: Optional[Annotated[int, Meta(ge=1, le=5)]] = None
 
-class ServiceRequestCreatedEvent(BaseModel):
+class ServiceRequestCreatedEvent(Schema, kw_only=True):
     event_type: Literal["service_request_created"] = "service_request_created"
     ts: datetime
     request_id: str
@@ -210,7 +199,7 @@ class ServiceRequestCreatedEvent(BaseModel):
     subcategory: Optional[str] = None
     source: str
 
-class ServiceRequestStatusChangeEvent(BaseModel):
+class ServiceRequestStatusChangeEvent(Schema, kw_only=True):
     event_type: Literal["service_request_status_change"] = "service_request_status_change"
     ts: datetime
     request_id: str
@@ -218,16 +207,16 @@ class ServiceRequestStatusChangeEvent(BaseModel):
     new_status: str
     ts_change: datetime
 
-class PreferenceSignalEvent(BaseModel):
+class PreferenceSignalEvent(Schema, kw_only=True):
     event_type: Literal["preference_signal"] = "preference_signal"
     ts: datetime
     guest_id: str
     key: str
     value: str
-    weight: float = Field(ge=0, le=1)
+    weight: Annotated[float, Meta(ge=0, le=1)]
     source: Literal["choice", "search", "click"]
 
-class SelectionEvent(BaseModel):
+class SelectionEvent(Schema, kw_only=True):
     event_type: Literal["selection"] = "selection"
     ts: datetime
     guest_id: str
@@ -236,6 +225,7 @@ class SelectionEvent(BaseModel):
     context: Optional[str] = None
     path: str
 
+# Stays a pydantic model: used as a FastAPI request body on /consent
 class ConsentChangeEvent(BaseModel):
     event_type: Literal["consent_change"] = "consent_change"
     ts: datetime
@@ -243,8 +233,12 @@ class ConsentChangeEvent(BaseModel):
     consent_given: bool
     purposes: List[str]
 
-# Webhook payload with HMAC
+# Webhook payload with HMAC (FastAPI request body, stays pydantic)
 class WebhookPayload(BaseModel):
     timestamp: datetime
     signature: str
-    payload: Any
\ No newline at end of file
+    payload: Any
+
+# Decoders for the ingest hot paths, built once at import time
+EVENT_ENVELOPE_DECODER = msgspec.json.Decoder(EventEnvelope)
+EVENT_BATCH_DECODER = msgspec.json.Decoder(List[EventEnvelope])
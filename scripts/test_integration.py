@@ -5,172 +5,189 @@ Integration tests for CBC Analytics Platform
 
 import asyncio
 import httpx
-import json
+import orjson
+import os
 import uuid
 import hashlib
 import hmac
-from datetime import datetime
+import time
 import sys
 
 API_BASE_URL = "http://localhost:8001"
 HMAC_SECRET = "change-me-in-production"
+HMAC_SECRET_BYTES = HMAC_SECRET.encode()
+# Prototype HMAC carries the derived ipad/opad state; copying it per
+# message skips the key-derivation compressions on every signature
+_HMAC_PROTO = hmac.new(HMAC_SECRET_BYTES, b"", hashlib.sha256)
+
+def now_iso() -> str:
+    """Current UTC time as an ISO-8601 string
+
+    Integer time plus one f-string; skips the datetime allocation and
+    per-field formatting that utcnow().isoformat() pays on every call.
+    """
+    s, ns = divmod(time.time_ns(), 1_000_000_000)
+    t = time.gmtime(s)
+    return (f"{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d}"
+            f"T{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}.{ns // 1000:06d}")
+
+# Static test-event fields; generate_test_event copies this and fills in
+# only the three per-call fields
+_TEST_EVENT_BASE = {
+    "app_id": "CBC-Agent",
+    "event_type": "page_view",
+    "ts": "",
+    "session_id": "",
+    "guest_pseudonymous_id": "",
+    "channel": "web",
+    "locale": "en-US",
+    "device_type": "desktop",
+    "app_version": "1.0.0",
+    "consent_flags": {
+        "analytics": True,
+        "marketing": False
+    },
+    "path": "/test",
+    "referrer": None,
+    "ms_on_page": 5000
+}
 
 def generate_test_event():
     """Generate a test event"""
-    return {
-        "app_id": "CBC-Agent",
-        "event_type": "page_view",
-        "ts": datetime.utcnow().isoformat(),
-        "session_id": f"test_ses_{uuid.uuid4().hex[:8]}",
-        "guest_pseudonymous_id": hashlib.sha256(str(uuid.uuid4()).encode()).hexdigest()[:16],
-        "channel": "web",
-        "locale": "en-US",
-        "device_type": "desktop",
-        "app_version": "1.0.0",
-        "consent_flags": {
-            "analytics": True,
-            "marketing": False
-        },
-        "path": "/test",
-        "referrer": None,
-        "ms_on_page": 5000
-    }
+    event = _TEST_EVENT_BASE.copy()
+    # Fresh nested dict so tests can flip consent flags without touching
+    # the shared base
+    event["consent_flags"] = _TEST_EVENT_BASE["consent_flags"].copy()
+    event["ts"] = now_iso()
+    event["session_id"] = "test_ses_" + os.urandom(4).hex()
+    event["guest_pseudonymous_id"] = hashlib.blake2b(uuid.uuid4().bytes, digest_size=8).hexdigest()
+    return event
 
 def generate_webhook_signature(payload):
     """Generate HMAC signature for webhook"""
-    message = json.dumps(payload, sort_keys=True)
-    signature = hmac.new(
-        HMAC_SECRET.encode(),
-        message.encode(),
-        hashlib.sha256
-    ).hexdigest()
-    return signature
-
-async def test_health_check():
+    # orjson returns bytes directly, so no encode step before signing
+    message = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+    h = _HMAC_PROTO.copy()
+    h.update(message)
+    return h.hexdigest()
+
+async def test_health_check(client: httpx.AsyncClient):
     """Test API health endpoint"""
-    async with httpx.AsyncClient() as client:
-        response = await client.get(f"{API_BASE_URL}/health")
-        assert response.status_code == 200
-        data = response.json()
-        assert data["status"] == "healthy"
-        print("✓ Health check passed")
+    response = await client.get(f"{API_BASE_URL}/health")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "healthy"
+    print("✓ Health check passed")
 
-async def test_event_ingestion():
+async def test_event_ingestion(client: httpx.AsyncClient):
     """Test event ingestion"""
-    async with httpx.AsyncClient() as client:
-        event = generate_test_event()
-        response = await client.post(
-            f"{API_BASE_URL}/ingest/event",
-            json=event
-        )
-        assert response.status_code == 200
-        data = response.json()
-        assert data["status"] == "ok"
-        assert "event_id" in data
-        print("✓ Event ingestion passed")
-
-async def test_invalid_app_id():
+    event = generate_test_event()
+    response = await client.post(
+        f"{API_BASE_URL}/ingest/event",
+        json=event
+    )
+    assert response.status_code == 202
+    data = response.json()
+    assert data["status"] == "accepted"
+    assert "event_id" in data
+    print("✓ Event ingestion passed")
+
+async def test_invalid_app_id(client: httpx.AsyncClient):
     """Test rejection of invalid app_id"""
-    async with httpx.AsyncClient() as client:
-        event = generate_test_event()
-        event["app_id"] = "InvalidApp"
-        response = await client.post(
-            f"{API_BASE_URL}/ingest/event",
-            json=event
-        )
-        assert response.status_code == 400
-        print("✓ Invalid app_id rejection passed")
-
-async def test_dnt_header():
+    event = generate_test_event()
+    event["app_id"] = "InvalidApp"
+    response = await client.post(
+        f"{API_BASE_URL}/ingest/event",
+        json=event
+    )
+    assert response.status_code == 400
+    print("✓ Invalid app_id rejection passed")
+
+async def test_dnt_header(client: httpx.AsyncClient):
     """Test Do-Not-Track header respect"""
-    async with httpx.AsyncClient() as client:
-        event = generate_test_event()
-        response = await client.post(
-            f"{API_BASE_URL}/ingest/event",
-            json=event,
-            headers={"DNT": "1"}
-        )
-        assert response.status_code == 200
-        data = response.json()
-        assert data.get("dnt") == True
-        print("✓ DNT header respect passed")
-
-async def test_webhook_with_signature():
+    event = generate_test_event()
+    response = await client.post(
+        f"{API_BASE_URL}/ingest/event",
+        json=event,
+        headers={"DNT": "1"}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data.get("dnt") == True
+    print("✓ DNT header respect passed")
+
+async def test_webhook_with_signature(client: httpx.AsyncClient):
     """Test webhook with valid signature"""
-    async with httpx.AsyncClient() as client:
-        payload = {
-            "request_id": f"test_req_{uuid.uuid4().hex[:8]}",
-            "guest_id": "test_guest_123",
-            "channel": "chatbot",
-            "category": "room_service",
-            "priority": "medium",
-            "ts": datetime.utcnow().isoformat()
-        }
-        
-        webhook_data = {
-            "payload": payload,
-            "signature": generate_webhook_signature(payload),
-            "ts": datetime.utcnow().isoformat()
-        }
-        
-        response = await client.post(
-            f"{API_BASE_URL}/webhook/cbc-agent/service_request",
-            json=webhook_data,
-            headers={"X-Signature": webhook_data["signature"]}
-        )
-        assert response.status_code == 200
-        print("✓ Webhook with signature passed")
-
-async def test_webhook_invalid_signature():
+    payload = {
+        "request_id": "test_req_" + os.urandom(4).hex(),
+        "guest_id": "test_guest_123",
+        "channel": "chatbot",
+        "category": "room_service",
+        "priority": "medium",
+        "ts": now_iso()
+    }
+    
+    webhook_data = {
+        "payload": payload,
+        "signature": generate_webhook_signature(payload),
+        "ts": now_iso()
+    }
+    
+    response = await client.post(
+        f"{API_BASE_URL}/webhook/cbc-agent/service_request",
+        json=webhook_data,
+        headers={"X-Signature": webhook_data["signature"]}
+    )
+    assert response.status_code == 200
+    print("✓ Webhook with signature passed")
+
+async def test_webhook_invalid_signature(client: httpx.AsyncClient):
     """Test webhook rejection with invalid signature"""
-    async with httpx.AsyncClient() as client:
-        payload = {
-            "request_id": "test_req",
-            "guest_id": "test_guest",
-            "channel": "chatbot",
-            "category": "room_service",
-            "priority": "medium",
-            "ts": datetime.utcnow().isoformat()
-        }
-        
-        webhook_data = {
-            "payload": payload,
-            "signature": "invalid_signature",
-            "ts": datetime.utcnow().isoformat()
-        }
-        
-        response = await client.post(
-            f"{API_BASE_URL}/webhook/cbc-agent/service_request",
-            json=webhook_data,
-            headers={"X-Signature": "invalid_signature"}
-        )
-        assert response.status_code == 401
-        print("✓ Invalid webhook signature rejection passed")
-
-async def test_consent_validation():
+    payload = {
+        "request_id": "test_req",
+        "guest_id": "test_guest",
+        "channel": "chatbot",
+        "category": "room_service",
+        "priority": "medium",
+        "ts": now_iso()
+    }
+    
+    webhook_data = {
+        "payload": payload,
+        "signature": "invalid_signature",
+        "ts": now_iso()
+    }
+    
+    response = await client.post(
+        f"{API_BASE_URL}/webhook/cbc-agent/service_request",
+        json=webhook_data,
+        headers={"X-Signature": "invalid_signature"}
+    )
+    assert response.status_code == 401
+    print("✓ Invalid webhook signature rejection passed")
+
+async def test_consent_validation(client: httpx.AsyncClient):
     """Test consent validation"""
-    async with httpx.AsyncClient() as client:
-        event = generate_test_event()
-        event["consent_flags"]["analytics"] = False
-        
-        response = await client.post(
-            f"{API_BASE_URL}/ingest/event",
-            json=event
-        )
-        assert response.status_code == 200
-        data = response.json()
-        assert data.get("consent") == False
-        print("✓ Consent validation passed")
-
-async def test_metrics_endpoint():
+    event = generate_test_event()
+    event["consent_flags"]["analytics"] = False
+    
+    response = await client.post(
+        f"{API_BASE_URL}/ingest/event",
+        json=event
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data.get("consent") == False
+    print("✓ Consent validation passed")
+
+async def test_metrics_endpoint(client: httpx.AsyncClient):
     """Test metrics retrieval"""
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{API_BASE_URL}/metrics/sessions?window=7d"
-        )
-        # May return 500 if no data, but endpoint should exist
-        assert response.status_code in [200, 500]
-        print("✓ Metrics endpoint passed")
+    response = await client.get(
+        f"{API_BASE_URL}/metrics/sessions?window=7d"
+    )
+    # May return 500 if no data, but endpoint should exist
+    assert response.status_code in [200, 500]
+    print("✓ Metrics endpoint passed")
 
 async def run_all_tests():
     """Run all integration tests"""
@@ -192,16 +209,19 @@ async def run_all_tests():
     passed = 0
     failed = 0
     
-    for test_name, test_func in tests:
-        try:
-            await test_func()
-            passed += 1
-        except AssertionError as e:
-            print(f"✗ {test_name} failed: {e}")
-            failed += 1
-        except Exception as e:
-            print(f"✗ {test_name} error: {e}")
-            failed += 1
+    # One client for the whole run; every test reuses its connection pool
+    # instead of paying a fresh socket setup per test
+    async with httpx.AsyncClient() as client:
+        for test_name, test_func in tests:
+            try:
+                await test_func(client)
+                passed += 1
+            except AssertionError as e:
+                print(f"✗ {test_name} failed: {e}")
+                failed += 1
+            except Exception as e:
+                print(f"✗ {test_name} error: {e}")
+                failed += 1
     
     print("\n" + "="*50)
     print(f"Results: {passed} passed, {failed} failed")